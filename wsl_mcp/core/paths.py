@@ -0,0 +1,64 @@
+"""
+WSL路径转换模块
+提供Windows路径与WSL路径之间的纯Python转换，以及WSL路径的Shell转义
+"""
+
+import re
+import shlex
+
+
+_BACKSLASH_TO_SLASH = str.maketrans("\\", "/")
+
+_SLASH_RUN_RE = re.compile(r'/{2,}')
+
+
+def convert_windows_path(windows_path: str) -> str:
+    """
+    将Windows路径转换为WSL路径
+    
+    参数:
+        windows_path: Windows路径，如 C:\\Users\\Name
+        
+    返回:
+        WSL路径，如 /mnt/c/Users/Name
+    """
+    if len(windows_path) >= 2 and windows_path[1] == ':':
+        tail = windows_path[2:].translate(_BACKSLASH_TO_SLASH).lstrip('/')
+        if '//' in tail:
+            tail = _SLASH_RUN_RE.sub('/', tail)
+        return f"/mnt/{windows_path[0].lower()}/{tail}"
+    return windows_path
+
+
+def convert_to_windows_path(wsl_path: str) -> str:
+    """
+    将WSL路径转换为Windows路径
+    
+    参数:
+        wsl_path: WSL路径，如 /mnt/c/Users/Name
+        
+    返回:
+        Windows路径，如 C:\\Users\\Name
+    """
+    if wsl_path.startswith("/mnt/"):
+        drive, _, tail = wsl_path[5:].partition("/")
+        if drive:
+            return f"{drive.upper()}:\\" + tail.replace("/", "\\")
+    return wsl_path
+
+
+def shell_quote(path: str) -> str:
+    """
+    把WSL路径转义为一个Shell参数，以 ~ 开头的路径仍展开为用户主目录
+    
+    参数:
+        path: WSL中的路径
+        
+    返回:
+        可直接拼接进Shell命令的参数
+    """
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"' + shlex.quote(path[1:])
+    return shlex.quote(path)
@@ -3,29 +3,443 @@ WSL核心执行模块
 提供WSL命令执行的基础功能
 """
 
+import asyncio
+import atexit
+import collections
 import subprocess
 import os
-from typing import Dict, Any, Optional
+import sys
+import queue
+import re
+import shlex
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Optional, Callable, Tuple, List, Sequence, Iterator, NamedTuple
 from dataclasses import dataclass
 
+from . import paths
 
-@dataclass
+# asyncio.timeout 只在 Python 3.11+ 提供；更早的版本使用可选的 async_timeout，
+# 两者都不可用时退回 asyncio.wait_for
+if sys.version_info >= (3, 11):
+    _async_timeout = asyncio.timeout
+else:
+    try:
+        from async_timeout import timeout as _async_timeout
+    except ImportError:
+        _async_timeout = None
+
+_MISSING = object()
+
+# 出现这些字符的命令需要交给Shell解释
+_SHELL_META = frozenset("|&;<>()$`\\\"'*?~[#\n")
+
+# 只能由Shell执行的关键字和内建命令，不能直接 --exec
+_SHELL_BUILTINS = frozenset((
+    "!", "{", "}", "if", "then", "else", "elif", "fi", "case", "esac",
+    "for", "while", "until", "do", "done", ".", "alias", "break", "cd", "chdir",
+    "command", "continue", "eval", "exec", "exit", "export", "getopts",
+    "hash", "local", "read", "readonly", "return", "set", "shift",
+    "source", "times", "trap", "type", "ulimit", "umask", "unalias",
+    "unset", "wait",
+))
+
+# 合法的发行版名称，批量命令拼接进cmd.exe脚本前先校验
+_DISTRO_NAME_RE = re.compile(r'[\w.-]+')
+
+# 批量命令中每个wsl.exe调用之后输出的返回码标记
+_MANY_RC_RE = re.compile(r'__MCP_RC_(\d+)__(-?\d+)')
+
+# 非空行，兼容CRLF换行
+_LINE_RE = re.compile(r'[^\r\n]+')
+
+# wsl -l --verbose 的数据行，如 "* Ubuntu    Running    2"
+_DISTRO_ROW_RE = re.compile(r'[ \t]*(\*?)[ \t]*(\S+)[ \t]+(\S+)[ \t]+(\d+)')
+
+
+@dataclass(frozen=True)
 class WSLCommandResult:
     """WSL命令执行结果"""
+    # 手写 __slots__ 而不用 dataclass(slots=True)，以兼容 Python 3.10 之前的版本
+    __slots__ = ("returncode", "stdout", "stderr")
+    
     returncode: int
     stdout: str
     stderr: str
 
 
+class Distro(NamedTuple):
+    """已安装的WSL发行版"""
+    name: str
+    state: str
+    version: str
+    default: bool
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为中文键名的字典，与早期版本的返回格式一致
+        
+        返回:
+            发行版信息字典
+        """
+        return {
+            "名称": self.name,
+            "状态": self.state,
+            "版本": self.version,
+            "默认": self.default
+        }
+
+
+class _PipeReader:
+    """
+    管道读取器
+    在后台线程中持续读取管道数据，供调用方按结束标记分段读取
+    """
+    
+    def __init__(self, pipe):
+        """
+        初始化管道读取器
+        
+        参数:
+            pipe: 以无缓冲二进制模式打开的管道
+        """
+        self._pipe = pipe
+        self._chunks: "queue.Queue[bytes]" = queue.Queue()
+        self._buffer = bytearray()
+        thread = threading.Thread(target=self._pump, daemon=True)
+        thread.start()
+    
+    def _pump(self) -> None:
+        """后台线程：读取管道直到EOF，空字节串表示EOF"""
+        try:
+            while True:
+                chunk = self._pipe.read(65536)
+                if not chunk:
+                    break
+                self._chunks.put(chunk)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._chunks.put(b"")
+    
+    def read_until(self, marker: bytes, deadline: float) -> bytes:
+        """
+        读取数据直到出现结束标记
+        
+        参数:
+            marker: 结束标记
+            deadline: 截止时间（time.monotonic()）
+            
+        返回:
+            结束标记之前的数据，结束标记本身被丢弃
+            
+        异常:
+            subprocess.TimeoutExpired: 超过截止时间
+            EOFError: 管道已关闭
+        """
+        while True:
+            index = self._buffer.find(marker)
+            if index >= 0:
+                data = bytes(self._buffer[:index])
+                del self._buffer[:index + len(marker)]
+                return data
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(marker, 0)
+            try:
+                chunk = self._chunks.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(marker, 0)
+            if not chunk:
+                raise EOFError
+            self._buffer += chunk
+    
+    def drain(self) -> bytes:
+        """
+        取出已读取但尚未消费的全部数据
+        
+        返回:
+            缓冲区中的数据
+        """
+        while True:
+            try:
+                chunk = self._chunks.get_nowait()
+            except queue.Empty:
+                break
+            if chunk:
+                self._buffer += chunk
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class PersistentShell:
+    """
+    常驻WSL Shell会话
+    保持一个wsl.exe进程，通过stdin发送命令并以结束标记分隔输出，
+    避免每条命令都重新启动wsl.exe
+    """
+    
+    def __init__(self, argv: Sequence[str]):
+        """
+        初始化Shell会话，进程在第一次执行命令时启动
+        
+        参数:
+            argv: 启动Shell的命令行，如 ["wsl.exe", "sh"]
+        """
+        self.argv = list(argv)
+        self._proc: Optional[subprocess.Popen] = None
+        self._stdout: Optional[_PipeReader] = None
+        self._stderr: Optional[_PipeReader] = None
+        self._lock = threading.Lock()
+        self._token = uuid.uuid4().hex
+        self._stdout_marker = f"\n__MCP_EOF_{self._token}__".encode()
+        self._stderr_marker = f"\n__MCP_EOF_{self._token}__\n".encode()
+    
+    def _start(self) -> None:
+        """启动Shell进程"""
+        self._proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        self._stdout = _PipeReader(self._proc.stdout)
+        self._stderr = _PipeReader(self._proc.stderr)
+    
+    def _send(self, command: str) -> None:
+        """
+        将命令连同结束标记写入Shell的stdin
+        
+        复合命令转义后交给子Shell中的eval执行，cd、export等操作不会影响后续命令，
+        语法错误（如引号未闭合）也只会让eval失败，不会吞掉后面的结束标记；
+        简单命令直接执行以省去一次fork；stdin重定向到/dev/null，
+        避免命令读走后续的输入
+        """
+        if not command.strip():
+            command = ":"
+        if _split_simple_command(command) is not None:
+            body = f"{command} </dev/null; "
+        else:
+            body = f"( eval {shlex.quote(command)} ) </dev/null; "
+        script = (
+            body +
+            f"printf '\\n__MCP_EOF_{self._token}__%d\\n' \"$?\"; "
+            f"printf '\\n__MCP_EOF_{self._token}__\\n' >&2\n"
+        )
+        self._proc.stdin.write(script.encode("utf-8"))
+        self._proc.stdin.flush()
+    
+    def run(self, command: str, timeout: int = 30) -> WSLCommandResult:
+        """
+        在Shell会话中执行命令
+        
+        参数:
+            command: 要执行的命令
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果
+        """
+        stdout, stderr, returncode = self.run_bytes(command, timeout)
+        return WSLCommandResult(
+            returncode=returncode,
+            stdout=stdout.decode("utf-8", errors="replace").strip(),
+            stderr=stderr.decode("utf-8", errors="replace").strip()
+        )
+    
+    def run_bytes(self, command: str, timeout: int = 30) -> Tuple[bytes, bytes, int]:
+        """
+        在Shell会话中执行命令，返回未解码的原始输出
+        
+        参数:
+            command: 要执行的命令
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            (stdout, stderr, 返回码)，执行失败时返回码为-1，错误信息在stderr中
+        """
+        with self._lock:
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start()
+                try:
+                    self._send(command)
+                except OSError:
+                    # Shell已退出（如执行了wsl --shutdown），重启后重试一次
+                    self._kill()
+                    self._start()
+                    self._send(command)
+                
+                deadline = time.monotonic() + timeout
+                stdout = self._stdout.read_until(self._stdout_marker, deadline)
+                returncode = int(self._stdout.read_until(b"\n", deadline))
+                stderr = self._stderr.read_until(self._stderr_marker, deadline)
+            except subprocess.TimeoutExpired:
+                self._kill()
+                return b"", "命令执行超时".encode("utf-8"), -1
+            except EOFError:
+                stderr = self._stderr.drain() if self._stderr else b""
+                self._kill()
+                return b"", stderr.strip() or "WSL Shell会话意外退出".encode("utf-8"), -1
+            except Exception as e:
+                self._kill()
+                return b"", str(e).encode("utf-8"), -1
+        
+        return stdout, stderr, returncode
+    
+    def _kill(self) -> None:
+        """强制结束Shell进程"""
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+                self._proc.wait(timeout=5)
+            except Exception:
+                pass
+            self._proc = None
+    
+    def close(self) -> None:
+        """关闭Shell会话"""
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                try:
+                    self._proc.stdin.write(b"exit\n")
+                    self._proc.stdin.close()
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    pass
+            self._kill()
+
+
+def _split_simple_command(command: str) -> Optional[List[str]]:
+    """
+    拆分不需要Shell解释的简单命令
+    
+    参数:
+        command: 命令字符串
+        
+    返回:
+        命令不含Shell元字符、引号、变量赋值和内建命令时返回参数列表，否则返回None
+    """
+    if _SHELL_META.isdisjoint(command):
+        argv = command.split()
+        if argv and argv[0] not in _SHELL_BUILTINS and "=" not in argv[0]:
+            return argv
+    return None
+
+
+def _decode_wsl_output(raw: bytes) -> str:
+    """
+    解码wsl.exe自身的输出
+    
+    wsl.exe 的管理命令（-l、--status、--version 等）默认输出UTF-16LE，
+    设置了 WSL_UTF8=1 时输出UTF-8
+    
+    参数:
+        raw: 原始输出
+        
+    返回:
+        解码后的文本，换行统一为LF
+    """
+    if raw.startswith(b'\xff\xfe'):
+        text = raw[2:].decode('utf-16-le', errors='replace')
+    elif b'\x00' in raw:
+        text = raw.decode('utf-16-le', errors='replace')
+    else:
+        text = raw.decode('utf-8', errors='replace')
+    return text.replace('\r\n', '\n')
+
+
+def _iter_rows(output: str) -> Iterator[str]:
+    """
+    逐行遍历 wsl -l 系列命令的输出，跳过空行和第一行表头
+    
+    参数:
+        output: 命令输出
+        
+    返回:
+        数据行迭代器
+    """
+    return islice((match.group() for match in _LINE_RE.finditer(output)), 1, None)
+
+
+def _parse_online_distributions(output: str) -> list:
+    """
+    解析 wsl -l --online 的输出
+    
+    参数:
+        output: 命令输出
+        
+    返回:
+        可用发行版列表
+    """
+    distros = []
+    for line in _iter_rows(output):
+        line = line.strip()
+        if line:
+            distros.append(line)
+    return distros
+
+
+def _parse_distributions(output: str) -> List[Distro]:
+    """
+    解析 wsl -l --verbose 的输出
+    
+    参数:
+        output: 命令输出
+        
+    返回:
+        发行版列表
+    """
+    distros = []
+    for line in _iter_rows(output):
+        match = _DISTRO_ROW_RE.match(line)
+        if match is None:
+            continue
+        distros.append(Distro(
+            name=match.group(2),
+            state=match.group(3),
+            version=match.group(4),
+            default=match.group(1) == "*"
+        ))
+    return distros
+
+
 class WSLTool:
     """
     WSL工具类
     提供在WSL2环境中执行命令的功能
     """
     
+    # WSL状态查询结果的缓存有效期（秒）
+    CACHE_TTL = 5.0
+    
+    # 已安装的发行版列表（含默认发行版）、WSL版本、可在线安装的发行版列表很少变化，
+    # 缓存更久；本工具的安装/注销/设置默认等操作会使其失效，外部变化可用 refresh() 刷新
+    STATIC_CACHE_TTL = 300.0
+    
+    # 后台执行关闭/终止操作的线程池，所有实例共享，随进程一直存在
+    _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wsl-")
+    
     def __init__(self):
         """初始化WSL工具"""
         self.wsl_path = self._find_wsl()
+        # 无参数管理命令的命令行，只构造一次
+        self._argv_shutdown = (self.wsl_path, "--shutdown")
+        self._argv_status = (self.wsl_path, "--status")
+        self._argv_version = (self.wsl_path, "--version")
+        self._argv_list = (self.wsl_path, "-l", "--verbose")
+        self._argv_list_online = (self.wsl_path, "-l", "--online")
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._shells: Dict[Tuple[str, str], PersistentShell] = {}
+        self._shells_lock = threading.Lock()
+        # 会话工作目录，设置后默认发行版中执行的命令都先切换到该目录
+        self._cwd: Optional[str] = None
+        atexit.register(self.close)
     
     def _find_wsl(self) -> str:
         """
@@ -36,48 +450,429 @@ class WSLTool:
         """
         return "wsl.exe"
     
-    def execute_command(
-        self, 
-        command: str, 
-        timeout: int = 30
+    def _cached(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        """
+        返回缓存的查询结果，未命中或已过期时调用fn重新获取
+        
+        参数:
+            key: 缓存键
+            ttl: 有效期（秒）
+            fn: 获取结果的函数
+            
+        返回:
+            查询结果
+        """
+        value = self._cache_lookup(key, ttl)
+        if value is _MISSING:
+            value = self._cache_store(key, fn())
+        return value
+    
+    def _cache_lookup(self, key: str, ttl: float) -> Any:
+        """
+        查找未过期的缓存项
+        
+        参数:
+            key: 缓存键
+            ttl: 有效期（秒）
+            
+        返回:
+            缓存的结果，未命中或已过期时返回 _MISSING
+        """
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        return _MISSING
+    
+    def _cache_store(self, key: str, value: Any) -> Any:
+        """
+        写入缓存项
+        
+        参数:
+            key: 缓存键
+            value: 查询结果
+            
+        返回:
+            写入的结果
+        """
+        self._cache[key] = (time.monotonic(), value)
+        return value
+    
+    def _invalidate(self, *keys: str) -> None:
+        """
+        使指定的缓存项失效
+        
+        参数:
+            keys: 缓存键
+        """
+        for key in keys:
+            self._cache.pop(key, None)
+    
+    def refresh(self) -> None:
+        """清空所有缓存的查询结果，下次调用时重新获取"""
+        self._cache.clear()
+    
+    def warm_up(self) -> None:
+        """预先获取发行版列表和WSL版本并写入缓存，供启动时在后台调用"""
+        self.list_distributions()
+        self.get_wsl_version()
+    
+    def _get_shell(self, distribution: str = "", user: str = "") -> PersistentShell:
+        """
+        获取指定发行版和用户的常驻Shell会话，不存在则创建
+        
+        参数:
+            distribution: WSL发行版名称，为空则使用默认
+            user: 用户名，为空则使用默认用户
+            
+        返回:
+            Shell会话
+        """
+        key = (distribution, user)
+        with self._shells_lock:
+            shell = self._shells.get(key)
+            if shell is None:
+                argv = [self.wsl_path]
+                if distribution:
+                    argv.extend(["-d", distribution])
+                if user:
+                    argv.extend(["-u", user])
+                argv.append("sh")
+                shell = PersistentShell(argv)
+                self._shells[key] = shell
+                # 新会话会启动发行版，缓存的运行状态随之过期
+                self._invalidate("list_distributions", "get_wsl_status")
+            return shell
+    
+    def close(self, distribution: Optional[str] = None) -> None:
+        """
+        关闭常驻Shell会话
+        
+        参数:
+            distribution: 只关闭该发行版的会话（包括使用默认发行版的会话），
+                为None则关闭全部
+        """
+        with self._shells_lock:
+            keys = [
+                key for key in self._shells
+                if distribution is None or key[0] in (distribution, "")
+            ]
+            shells = [self._shells.pop(key) for key in keys]
+        for shell in shells:
+            shell.close()
+    
+    def _run(
+        self,
+        argv: Sequence[str],
+        timeout: int,
+        wsl_output: bool = False,
+        stdin_bytes: Optional[bytes] = None,
+        env: Optional[Dict[str, str]] = None
     ) -> WSLCommandResult:
         """
-        执行WSL命令
+        执行一次性的wsl.exe命令，超时后结束进程并返回超时结果，不抛出异常
         
         参数:
-            command: 要在WSL中执行的命令
+            argv: 命令行参数
             timeout: 命令超时时间（秒）
+            wsl_output: 输出是否来自wsl.exe自身（管理命令），决定解码方式
+            stdin_bytes: 写入标准输入的数据，为None则不提供标准输入
+            env: 环境变量，为空则继承当前进程
             
         返回:
             命令执行结果
         """
         try:
-            result = subprocess.run(
-                [self.wsl_path, "sh", "-c", command],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding='utf-8',
-                errors='replace'
+            proc = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE if stdin_bytes is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env
             )
-            
+        except Exception as e:
             return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=result.stdout.strip(),
-                stderr=result.stderr.strip()
+                returncode=-1,
+                stdout="",
+                stderr=str(e)
             )
+        
+        try:
+            stdout, stderr = proc.communicate(stdin_bytes, timeout=timeout)
         except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
             return WSLCommandResult(
                 returncode=-1,
                 stdout="",
                 stderr="命令执行超时"
             )
+        except Exception as e:
+            proc.kill()
+            proc.wait()
+            return WSLCommandResult(
+                returncode=-1,
+                stdout="",
+                stderr=str(e)
+            )
+        
+        if wsl_output:
+            return WSLCommandResult(
+                returncode=proc.returncode,
+                stdout=_decode_wsl_output(stdout).strip(),
+                stderr=_decode_wsl_output(stderr).strip()
+            )
+        return WSLCommandResult(
+            returncode=proc.returncode,
+            stdout=stdout.decode("utf-8", errors="replace").strip(),
+            stderr=stderr.decode("utf-8", errors="replace").strip()
+        )
+    
+    def _run_wsl(
+        self,
+        argv: Sequence[str],
+        timeout: int,
+        env: Optional[Dict[str, str]] = None
+    ) -> WSLCommandResult:
+        """
+        执行wsl.exe管理命令，并按wsl.exe的输出编码解码
+        
+        参数:
+            argv: 命令行参数
+            timeout: 命令超时时间（秒）
+            env: 环境变量，为空则继承当前进程
+            
+        返回:
+            命令执行结果
+        """
+        return self._run(argv, timeout, wsl_output=True, env=env)
+    
+    def _run_many(
+        self,
+        option: str,
+        distributions: List[str],
+        timeout: int
+    ) -> Dict[str, WSLCommandResult]:
+        """
+        通过一次cmd.exe调用，对多个发行版依次执行同一个wsl.exe管理命令
+        
+        每个wsl.exe调用后输出带返回码的标记，据此拆分出各发行版的结果；
+        设置 WSL_UTF8=1 使wsl.exe的输出与cmd.exe的输出编码一致
+        
+        参数:
+            option: wsl.exe选项，如 -t、--unregister
+            distributions: 发行版名称列表
+            timeout: 整批命令的超时时间（秒）
+            
+        返回:
+            发行版名称到执行结果的映射
+        """
+        results: Dict[str, WSLCommandResult] = {}
+        valid = []
+        for name in distributions:
+            if _DISTRO_NAME_RE.fullmatch(name):
+                valid.append(name)
+            else:
+                results[name] = WSLCommandResult(
+                    returncode=-1,
+                    stdout="",
+                    stderr=f"无效的发行版名称: {name}"
+                )
+        if not valid:
+            return results
+        
+        script = " & ".join(
+            f"{self.wsl_path} {option} {name} 2>&1 & echo __MCP_RC_{index}__!errorlevel!"
+            for index, name in enumerate(valid)
+        )
+        env = dict(os.environ, WSL_UTF8="1")
+        result = self._run_wsl(["cmd.exe", "/v:on", "/c", script], timeout, env)
+        
+        # split 结果为 [输出0, 序号0, 返回码0, 输出1, 序号1, 返回码1, ..., 剩余输出]
+        parts = _MANY_RC_RE.split(result.stdout)
+        for i in range(1, len(parts) - 1, 3):
+            name = valid[int(parts[i])]
+            results[name] = WSLCommandResult(
+                returncode=int(parts[i + 1]),
+                stdout="",
+                stderr=parts[i - 1].strip()
+            )
+        for name in valid:
+            if name not in results:
+                results[name] = WSLCommandResult(
+                    returncode=-1,
+                    stdout="",
+                    stderr=result.stderr or "命令未执行"
+                )
+        return results
+    
+    def _run_wsl_streaming(self, argv: Sequence[str], timeout: int) -> WSLCommandResult:
+        """
+        执行耗时较长的wsl.exe管理命令（如 --export、--import）
+        
+        stdout直接丢弃，stderr在后台线程中持续读取，只保留最后一部分用于错误信息，
+        避免在内存中缓存全部输出，也避免stderr管道写满导致子进程阻塞
+        
+        参数:
+            argv: 命令行参数
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果，stdout为空
+        """
+        try:
+            proc = subprocess.Popen(
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
         except Exception as e:
             return WSLCommandResult(
                 returncode=-1,
                 stdout="",
                 stderr=str(e)
             )
+        
+        tail: "collections.deque[bytes]" = collections.deque(maxlen=64)
+        
+        def drain() -> None:
+            for chunk in iter(lambda: proc.stderr.read(4096), b""):
+                tail.append(chunk)
+        
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+        try:
+            returncode = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return WSLCommandResult(
+                returncode=-1,
+                stdout="",
+                stderr="命令执行超时"
+            )
+        finally:
+            reader.join(timeout=5)
+            proc.stderr.close()
+        
+        return WSLCommandResult(
+            returncode=returncode,
+            stdout="",
+            stderr=_decode_wsl_output(b"".join(tail)).strip()
+        )
+    
+    @property
+    def working_directory(self) -> Optional[str]:
+        """会话工作目录，未设置时为None"""
+        return self._cwd
+    
+    def set_working_directory(self, path: str) -> WSLCommandResult:
+        """
+        设置会话工作目录，之后在默认发行版中执行的命令都在该目录下运行
+        
+        参数:
+            path: 目录路径，相对路径基于当前会话工作目录
+            
+        返回:
+            执行结果，成功时stdout为解析后的绝对路径
+        """
+        result = self.execute_command(f"cd {paths.shell_quote(path)} && pwd -P", 10)
+        if result.returncode == 0:
+            self._cwd = result.stdout
+        return result
+    
+    def _with_cwd(self, command: str) -> str:
+        """
+        设置了会话工作目录时，为命令加上切换目录的前缀
+        
+        参数:
+            command: 要执行的命令
+            
+        返回:
+            实际执行的命令
+        """
+        if self._cwd is None:
+            return command
+        # 含换行的命令总在子Shell（或 sh -c）中执行，exit 不会结束常驻Shell
+        return f"cd {shlex.quote(self._cwd)} || exit 1\n{command}"
+    
+    def execute_command(
+        self, 
+        command: str, 
+        timeout: int = 30
+    ) -> WSLCommandResult:
+        """
+        执行WSL命令
+        
+        参数:
+            command: 要在WSL中执行的命令
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果
+        """
+        return self._get_shell().run(self._with_cwd(command), timeout)
+    
+    def execute_command_bytes(
+        self,
+        command: str,
+        timeout: int = 30
+    ) -> Tuple[bytes, bytes, int]:
+        """
+        执行WSL命令，返回未解码、未去除空白的原始输出
+        
+        参数:
+            command: 要在WSL中执行的命令
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            (stdout, stderr, 返回码)
+        """
+        return self._get_shell().run_bytes(self._with_cwd(command), timeout)
+    
+    def execute_command_stdin(
+        self,
+        command: str,
+        stdin_bytes: bytes,
+        timeout: int = 30
+    ) -> WSLCommandResult:
+        """
+        执行WSL命令，并把数据直接写入命令的标准输入
+        
+        数据不经过命令行，因此不受命令行长度限制，也不需要转义
+        
+        参数:
+            command: 要在WSL中执行的命令
+            stdin_bytes: 写入标准输入的数据
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果
+        """
+        return self._run(
+            [self.wsl_path, "--exec", "sh", "-c", self._with_cwd(command)],
+            timeout,
+            stdin_bytes=stdin_bytes
+        )
+    
+    def execute_command_with_distro(
+        self, 
+        command: str, 
+        distribution: str = "",
+        timeout: int = 30
+    ) -> WSLCommandResult:
+        """
+        执行指定WSL发行版的命令
+        
+        参数:
+            command: 要在WSL中执行的命令
+            distribution: WSL发行版名称
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果
+        """
+        return self._get_shell(distribution).run(command, timeout)
     
     def execute_command_advanced(
         self,
@@ -102,49 +897,60 @@ class WSLTool:
         返回:
             命令执行结果
         """
-        try:
-            cmd_list = [self.wsl_path]
-            
-            if distribution:
-                cmd_list.extend(["-d", distribution])
-            
-            if user:
-                cmd_list.extend(["-u", user])
-            
-            if working_dir:
-                cmd_list.extend(["--cd", working_dir])
-            
-            if shell_type:
-                cmd_list.extend(["--shell-type", shell_type])
+        command, cmd_list = self._advanced_argv(command, distribution, user, working_dir, shell_type)
+        
+        if not working_dir and not shell_type:
+            return self._get_shell(distribution, user).run(command, timeout)
+        
+        return self._run(cmd_list, timeout)
+    
+    def _advanced_argv(
+        self,
+        command: str,
+        distribution: str,
+        user: str,
+        working_dir: str,
+        shell_type: str
+    ) -> Tuple[str, List[str]]:
+        """
+        为高级命令执行应用会话工作目录并构造 wsl.exe 参数列表，同步与异步版本共用
+        
+        参数:
+            command: 要在WSL中执行的命令
+            distribution: WSL发行版名称，为空则使用默认
+            user: 用户名，为空则使用默认用户
+            working_dir: 工作目录，~表示主目录
+            shell_type: shell类型，可选 standard|login|none
             
+        返回:
+            实际执行的命令和参数列表
+        """
+        # 会话工作目录属于默认发行版，显式指定了发行版或工作目录时不适用
+        if not distribution and not working_dir:
+            command = self._with_cwd(command)
+        
+        cmd_list = [self.wsl_path]
+        
+        if distribution:
+            cmd_list.extend(["-d", distribution])
+        
+        if user:
+            cmd_list.extend(["-u", user])
+        
+        if working_dir:
+            cmd_list.extend(["--cd", working_dir])
+        
+        if shell_type:
+            cmd_list.extend(["--shell-type", shell_type])
+        
+        argv = _split_simple_command(command)
+        if argv is not None:
+            cmd_list.append("--exec")
+            cmd_list.extend(argv)
+        else:
             cmd_list.extend(["--exec", "sh", "-c", command])
-            
-            result = subprocess.run(
-                cmd_list,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=result.stdout.strip(),
-                stderr=result.stderr.strip()
-            )
-        except subprocess.TimeoutExpired:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr="命令执行超时"
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        
+        return command, cmd_list
     
     def shutdown_wsl(self) -> WSLCommandResult:
         """
@@ -153,26 +959,23 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "--shutdown"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout="WSL已关闭" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        self.close()
+        result = self._run_wsl(self._argv_shutdown, 10)
+        self._invalidate("list_distributions")
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout="WSL已关闭" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
+    
+    def shutdown_wsl_async(self) -> "Future[WSLCommandResult]":
+        """
+        在后台线程中关闭所有WSL发行版和虚拟机
+        
+        返回:
+            可获取执行结果的Future
+        """
+        return self._pool.submit(self.shutdown_wsl)
     
     def terminate_distribution(self, distribution: str) -> WSLCommandResult:
         """
@@ -184,26 +987,49 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "-t", distribution],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
+        self.close(distribution)
+        result = self._run_wsl([self.wsl_path, "-t", distribution], 10)
+        self._invalidate("list_distributions")
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout=f"发行版 {distribution} 已终止" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
+    
+    def terminate_distribution_async(self, distribution: str) -> "Future[WSLCommandResult]":
+        """
+        在后台线程中终止指定的WSL发行版
+        
+        参数:
+            distribution: 要终止的发行版名称
+            
+        返回:
+            可获取执行结果的Future
+        """
+        return self._pool.submit(self.terminate_distribution, distribution)
+    
+    def terminate_many(self, distributions: List[str]) -> Dict[str, WSLCommandResult]:
+        """
+        批量终止多个WSL发行版，只启动一次cmd.exe
+        
+        参数:
+            distributions: 要终止的发行版名称列表
+            
+        返回:
+            发行版名称到执行结果的映射
+        """
+        for name in distributions:
+            self.close(name)
+        results = self._run_many("-t", distributions, 10 + 5 * len(distributions))
+        self._invalidate("list_distributions")
+        return {
+            name: WSLCommandResult(
                 returncode=result.returncode,
-                stdout=f"发行版 {distribution} 已终止" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
+                stdout=f"发行版 {name} 已终止" if result.returncode == 0 else "",
+                stderr="" if result.returncode == 0 else result.stderr
             )
+            for name, result in results.items()
+        }
     
     def set_default_distribution(self, distribution: str) -> WSLCommandResult:
         """
@@ -215,26 +1041,18 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "-s", distribution],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=f"{distribution} 已设为默认发行版" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        # 使用默认发行版的常驻Shell仍连着原来的发行版，需要关闭后重新创建
+        self.close(distribution)
+        result = self._run_wsl([self.wsl_path, "-s", distribution], 10)
+        self._invalidate("list_distributions", "get_wsl_status")
+        if result.returncode == 0:
+            # 会话工作目录属于原来的默认发行版
+            self._cwd = None
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout=f"{distribution} 已设为默认发行版" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
     
     def export_distribution(
         self,
@@ -253,26 +1071,15 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "--export", distribution, file_path, "--format", format_type],
-                capture_output=True,
-                text=True,
-                timeout=300,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=f"发行版已导出到 {file_path}" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        result = self._run_wsl_streaming(
+            [self.wsl_path, "--export", distribution, file_path, "--format", format_type],
+            300
+        )
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout=f"发行版已导出到 {file_path}" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
     
     def import_distribution(
         self,
@@ -293,26 +1100,16 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "--import", distribution, install_location, file_path, "--version", str(version)],
-                capture_output=True,
-                text=True,
-                timeout=300,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=f"发行版 {distribution} 已导入" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        result = self._run_wsl_streaming(
+            [self.wsl_path, "--import", distribution, install_location, file_path, "--version", str(version)],
+            300
+        )
+        self._invalidate("list_distributions")
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout=f"发行版 {distribution} 已导入" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
     
     def unregister_distribution(self, distribution: str) -> WSLCommandResult:
         """
@@ -324,26 +1121,37 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "--unregister", distribution],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
+        self.close(distribution)
+        result = self._run_wsl([self.wsl_path, "--unregister", distribution], 30)
+        self._invalidate("list_distributions", "get_wsl_status")
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout=f"发行版 {distribution} 已注销" if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
+    
+    def unregister_many(self, distributions: List[str]) -> Dict[str, WSLCommandResult]:
+        """
+        批量注销并删除多个WSL发行版，只启动一次cmd.exe
+        
+        参数:
+            distributions: 要注销的发行版名称列表
+            
+        返回:
+            发行版名称到执行结果的映射
+        """
+        for name in distributions:
+            self.close(name)
+        results = self._run_many("--unregister", distributions, 30 * len(distributions))
+        self._invalidate("list_distributions", "get_wsl_status")
+        return {
+            name: WSLCommandResult(
                 returncode=result.returncode,
-                stdout=f"发行版 {distribution} 已注销" if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
+                stdout=f"发行版 {name} 已注销" if result.returncode == 0 else "",
+                stderr="" if result.returncode == 0 else result.stderr
             )
+            for name, result in results.items()
+        }
     
     def get_wsl_status(self) -> WSLCommandResult:
         """
@@ -352,26 +1160,16 @@ class WSLTool:
         返回:
             状态信息
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "--status"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout=result.stdout.strip(),
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        return self._cached("get_wsl_status", self.CACHE_TTL, self._get_wsl_status)
+    
+    def _get_wsl_status(self) -> WSLCommandResult:
+        """
+        获取WSL状态信息（不使用缓存）
+        
+        返回:
+            状态信息
+        """
+        return self._run_wsl(self._argv_status, 10)
     
     def list_online_distributions(self) -> list:
         """
@@ -380,26 +1178,19 @@ class WSLTool:
         返回:
             可用发行版列表
         """
-        try:
-            result = subprocess.run(
-                [self.wsl_path, "-l", "--online"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                distros = []
-                for line in lines[1:]:
-                    if line.strip():
-                        distros.append(line.strip())
-                return distros
-            return []
-        except Exception:
-            return []
+        return self._cached("list_online_distributions", self.STATIC_CACHE_TTL, self._list_online_distributions)
+    
+    def _list_online_distributions(self) -> list:
+        """
+        列出可在线安装的WSL发行版（不使用缓存）
+        
+        返回:
+            可用发行版列表
+        """
+        result = self._run_wsl(self._argv_list_online, 30)
+        if result.returncode == 0:
+            return _parse_online_distributions(result.stdout)
+        return []
     
     def install_distribution(
         self,
@@ -418,37 +1209,24 @@ class WSLTool:
         返回:
             执行结果
         """
-        try:
-            cmd_list = [self.wsl_path, "--install"]
-            
-            if distribution:
-                cmd_list.append(distribution)
-            
-            if web_download:
-                cmd_list.append("--web-download")
-            
-            if no_launch:
-                cmd_list.extend(["--no-launch"])
-            
-            result = subprocess.run(
-                cmd_list,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return WSLCommandResult(
-                returncode=result.returncode,
-                stdout="正在安装发行版..." if result.returncode == 0 else "",
-                stderr=result.stderr.strip()
-            )
-        except Exception as e:
-            return WSLCommandResult(
-                returncode=-1,
-                stdout="",
-                stderr=str(e)
-            )
+        cmd_list = [self.wsl_path, "--install"]
+        
+        if distribution:
+            cmd_list.append(distribution)
+        
+        if web_download:
+            cmd_list.append("--web-download")
+        
+        if no_launch:
+            cmd_list.extend(["--no-launch"])
+        
+        result = self._run_wsl_streaming(cmd_list, 300)
+        self._invalidate("list_distributions", "get_wsl_status")
+        return WSLCommandResult(
+            returncode=result.returncode,
+            stdout="正在安装发行版..." if result.returncode == 0 else "",
+            stderr=result.stderr
+        )
     
     def get_wsl_version(self) -> str:
         """
@@ -457,44 +1235,37 @@ class WSLTool:
         返回:
             WSL版本字符串
         """
-        result = subprocess.run(
-            [self.wsl_path, "--version"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            encoding='utf-8',
-            errors='replace'
-        )
-        return result.stdout.strip() if result.returncode == 0 else "无法获取WSL版本"
+        return self._cached("get_wsl_version", self.STATIC_CACHE_TTL, self._get_wsl_version)
+    
+    def _get_wsl_version(self) -> str:
+        """
+        获取WSL版本信息（不使用缓存）
+        
+        返回:
+            WSL版本字符串
+        """
+        result = self._run_wsl(self._argv_version, 10)
+        return result.stdout if result.returncode == 0 else "无法获取WSL版本"
     
-    def list_distributions(self) -> list:
+    def list_distributions(self) -> List[Distro]:
         """
         列出已安装的WSL发行版
         
         返回:
             发行版列表
         """
-        result = subprocess.run(
-            [self.wsl_path, "-l", "--verbose"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            encoding='utf-8',
-            errors='replace'
-        )
+        return self._cached("list_distributions", self.STATIC_CACHE_TTL, self._list_distributions)
+    
+    def _list_distributions(self) -> List[Distro]:
+        """
+        列出已安装的WSL发行版（不使用缓存）
         
+        返回:
+            发行版列表
+        """
+        result = self._run_wsl(self._argv_list, 10)
         if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            distros = []
-            for line in lines[1:]:
-                if line.strip():
-                    parts = line.split()
-                    distros.append({
-                        "名称": parts[0],
-                        "状态": parts[1] if len(parts) > 1 else "",
-                        "版本": parts[2] if len(parts) > 2 else ""
-                    })
-            return distros
+            return _parse_distributions(result.stdout)
         return []
     
     def get_default_distribution(self) -> str:
@@ -502,17 +1273,172 @@ class WSLTool:
         获取默认WSL发行版
         
         返回:
-            默认发行版名称
+            默认发行版名称，取自 wsl -l --verbose 中带 * 标记的行
+        """
+        return next((d.name for d in self.list_distributions() if d.default), "")
+    
+    async def _arun(
+        self,
+        argv: Sequence[str],
+        timeout: int,
+        wsl_output: bool = False
+    ) -> WSLCommandResult:
         """
-        result = subprocess.run(
-            [self.wsl_path, "-e", "echo", "$WSL_DISTRO_NAME"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            encoding='utf-8',
-            errors='replace'
+        异步执行wsl.exe命令，多个调用可通过 asyncio.gather 并发执行
+        
+        参数:
+            argv: 命令行参数
+            timeout: 命令超时时间（秒）
+            wsl_output: 输出是否来自wsl.exe自身（管理命令），决定解码方式
+            
+        返回:
+            命令执行结果
+        """
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except Exception as e:
+            return WSLCommandResult(
+                returncode=-1,
+                stdout="",
+                stderr=str(e)
+            )
+        
+        try:
+            if _async_timeout is not None:
+                async with _async_timeout(timeout):
+                    stdout, stderr = await proc.communicate()
+            else:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return WSLCommandResult(
+                returncode=-1,
+                stdout="",
+                stderr="命令执行超时"
+            )
+        
+        if wsl_output:
+            return WSLCommandResult(
+                returncode=proc.returncode,
+                stdout=_decode_wsl_output(stdout).strip(),
+                stderr=_decode_wsl_output(stderr).strip()
+            )
+        return WSLCommandResult(
+            returncode=proc.returncode,
+            stdout=stdout.decode("utf-8", errors="replace").strip(),
+            stderr=stderr.decode("utf-8", errors="replace").strip()
         )
-        return result.stdout.strip() if result.returncode == 0 else ""
+    
+    async def aexecute_command(
+        self,
+        command: str,
+        timeout: int = 30
+    ) -> WSLCommandResult:
+        """
+        异步执行WSL命令
+        
+        参数:
+            command: 要在WSL中执行的命令
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            命令执行结果
+        """
+        command = self._with_cwd(command)
+        argv = _split_simple_command(command)
+        if argv is not None:
+            return await self._arun([self.wsl_path, "--exec", *argv], timeout)
+        return await self._arun([self.wsl_path, "--exec", "sh", "-c", command], timeout)
+    
+    async def aexecute_command_advanced(
+        self,
+        command: str,
+        distribution: str = "",
+        user: str = "",
+        working_dir: str = "",
+        shell_type: str = "",
+        timeout: int = 30
+    ) -> WSLCommandResult:
+        """
+        异步高级WSL命令执行，参数同 execute_command_advanced
+        
+        返回:
+            命令执行结果
+        """
+        _, cmd_list = self._advanced_argv(command, distribution, user, working_dir, shell_type)
+        return await self._arun(cmd_list, timeout)
+    
+    async def aget_wsl_status(self) -> WSLCommandResult:
+        """
+        异步获取WSL状态信息
+        
+        返回:
+            状态信息
+        """
+        value = self._cache_lookup("get_wsl_status", self.CACHE_TTL)
+        if value is _MISSING:
+            value = self._cache_store(
+                "get_wsl_status",
+                await self._arun(self._argv_status, 10, wsl_output=True)
+            )
+        return value
+    
+    async def alist_online_distributions(self) -> list:
+        """
+        异步列出可在线安装的WSL发行版
+        
+        返回:
+            可用发行版列表
+        """
+        value = self._cache_lookup("list_online_distributions", self.STATIC_CACHE_TTL)
+        if value is _MISSING:
+            result = await self._arun(self._argv_list_online, 30, wsl_output=True)
+            distros = _parse_online_distributions(result.stdout) if result.returncode == 0 else []
+            value = self._cache_store("list_online_distributions", distros)
+        return value
+    
+    async def aget_wsl_version(self) -> str:
+        """
+        异步获取WSL版本信息
+        
+        返回:
+            WSL版本字符串
+        """
+        value = self._cache_lookup("get_wsl_version", self.STATIC_CACHE_TTL)
+        if value is _MISSING:
+            result = await self._arun(self._argv_version, 10, wsl_output=True)
+            version = result.stdout if result.returncode == 0 else "无法获取WSL版本"
+            value = self._cache_store("get_wsl_version", version)
+        return value
+    
+    async def alist_distributions(self) -> List[Distro]:
+        """
+        异步列出已安装的WSL发行版
+        
+        返回:
+            发行版列表
+        """
+        value = self._cache_lookup("list_distributions", self.STATIC_CACHE_TTL)
+        if value is _MISSING:
+            result = await self._arun(self._argv_list, 10, wsl_output=True)
+            distros = _parse_distributions(result.stdout) if result.returncode == 0 else []
+            value = self._cache_store("list_distributions", distros)
+        return value
+    
+    async def aget_default_distribution(self) -> str:
+        """
+        异步获取默认WSL发行版
+        
+        返回:
+            默认发行版名称
+        """
+        return next((d.name for d in await self.alist_distributions() if d.default), "")
     
     def convert_windows_path(self, windows_path: str) -> str:
         """
@@ -524,11 +1450,7 @@ class WSLTool:
         返回:
             WSL路径，如 /mnt/c/Users/Name
         """
-        if len(windows_path) >= 2 and windows_path[1] == ':':
-            drive = windows_path[0].lower()
-            wsl_path = f"/mnt/{drive}/{windows_path[2:].replace('\\', '/').replace('//', '/')}"
-            return wsl_path
-        return windows_path
+        return paths.convert_windows_path(windows_path)
     
     def convert_to_windows_path(self, wsl_path: str) -> str:
         """
@@ -540,13 +1462,62 @@ class WSLTool:
         返回:
             Windows路径，如 C:\\Users\\Name
         """
-        if wsl_path.startswith("/mnt/"):
-            parts = wsl_path.split("/")
-            if len(parts) >= 3:
-                drive = parts[2].upper()
-                windows_path = f"{drive}:\\{'/'.join(parts[3:])}"
-                return windows_path.replace("/", "\\")
-        return wsl_path
+        return paths.convert_to_windows_path(wsl_path)
+    
+    def convert_paths_batch(
+        self,
+        path_list: List[str],
+        to_windows: bool = False,
+        timeout: int = 30
+    ) -> List[str]:
+        """
+        使用WSL中的wslpath批量转换路径
+        
+        所有路径在常驻Shell中一次完成转换，能正确处理UNC路径和
+        wsl.conf中自定义的挂载根目录；wslpath转换失败的路径回退到
+        convert_windows_path / convert_to_windows_path
+        
+        参数:
+            path_list: 要转换的路径列表
+            to_windows: True表示WSL路径转Windows路径，False表示Windows路径转WSL路径
+            timeout: 命令超时时间（秒）
+            
+        返回:
+            转换后的路径列表，顺序与输入一致
+        """
+        if not path_list:
+            return []
+        
+        fallback = paths.convert_to_windows_path if to_windows else paths.convert_windows_path
+        flag = "-w" if to_windows else "-u"
+        quoted = " ".join(shlex.quote(path) for path in path_list)
+        # 每行以 = 开头，避免空结果行被 strip 掉导致行数对不上
+        command = f"for p in {quoted}; do printf '=%s\\n' \"$(wslpath {flag} \"$p\" 2>/dev/null)\"; done"
+        result = self.execute_command(command, timeout)
+        
+        lines = result.stdout.split("\n")
+        if result.returncode != 0 or len(lines) != len(path_list):
+            return [fallback(path) for path in path_list]
+        return [line[1:] or fallback(path) for path, line in zip(path_list, lines)]
+
+
+_wsl_tool_lock = threading.Lock()
 
 
-wsl_tool = WSLTool()
+def __getattr__(name: str) -> Any:
+    """
+    延迟创建模块级的 wsl_tool 实例，首次访问时才初始化
+    
+    参数:
+        name: 属性名
+        
+    返回:
+        属性值
+    """
+    if name == "wsl_tool":
+        global wsl_tool
+        with _wsl_tool_lock:
+            if "wsl_tool" not in globals():
+                wsl_tool = WSLTool()
+        return wsl_tool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
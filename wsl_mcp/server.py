@@ -3,17 +3,88 @@ WSL MCP Server - WSL2环境管理工具
 基于FastMCP框架开发
 """
 
+import functools
+import inspect
+import threading
+from dataclasses import dataclass
+
 from fastmcp import FastMCP
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
+
+from wsl_mcp.core.wsl import WSLCommandResult, wsl_tool
+from wsl_mcp.tools import file_manager as fm
 
 mcp = FastMCP("WSL MCP")
 
 
+@dataclass(frozen=True)
+class CommandResult:
+    """execute_wsl_command 的返回结果，由FastMCP按字段序列化为JSON对象"""
+    __slots__ = ("成功", "命令", "输出", "错误", "返回码")
+    
+    成功: bool
+    命令: str
+    输出: str
+    错误: str
+    返回码: int
+
+
+@dataclass(frozen=True)
+class AdvancedCommandResult:
+    """execute_wsl_command_advanced 的返回结果，比 CommandResult 多出执行选项"""
+    __slots__ = ("成功", "命令", "发行版", "用户", "工作目录", "输出", "错误", "返回码")
+    
+    成功: bool
+    命令: str
+    发行版: str
+    用户: str
+    工作目录: str
+    输出: str
+    错误: str
+    返回码: int
+
+
+def wsl_result(**arg_keys: str) -> Callable[[Callable[..., WSLCommandResult]], Callable[..., Dict[str, Any]]]:
+    """
+    把返回 WSLCommandResult 的管理工具函数包装为返回统一格式的结果字典
+    
+    结果字典依次包含 成功、arg_keys 指定的参数、消息（stdout）和 错误（stderr）
+    
+    参数:
+        arg_keys: 结果中附带的参数，键为字段名，值为参数名；参数为空字符串时显示为"默认"
+        
+    返回:
+        装饰器
+    """
+    def decorator(fn: Callable[..., WSLCommandResult]) -> Callable[..., Dict[str, Any]]:
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            result = fn(*args, **kwargs)
+            
+            response: Dict[str, Any] = {"成功": result.returncode == 0}
+            for key, name in arg_keys.items():
+                value = bound.arguments[name]
+                response[key] = "默认" if value == "" else value
+            response["消息"] = result.stdout
+            response["错误"] = result.stderr
+            return response
+        
+        # FastMCP 根据签名生成工具描述，返回类型应为包装后的字典
+        wrapper.__signature__ = signature.replace(return_annotation=Dict[str, Any])
+        return wrapper
+    
+    return decorator
+
+
 @mcp.tool()
 def execute_wsl_command(
     command: str, 
     timeout: int = 30
-) -> Dict[str, Any]:
+) -> CommandResult:
     """
     执行WSL命令
     
@@ -24,16 +95,15 @@ def execute_wsl_command(
     返回:
         命令执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
     result = wsl_tool.execute_command(command, timeout)
     
-    return {
-        "成功": result.returncode == 0,
-        "命令": command,
-        "输出": result.stdout,
-        "错误": result.stderr,
-        "返回码": result.returncode
-    }
+    return CommandResult(
+        成功=result.returncode == 0,
+        命令=command,
+        输出=result.stdout,
+        错误=result.stderr,
+        返回码=result.returncode
+    )
 
 
 @mcp.tool()
@@ -44,7 +114,7 @@ def execute_wsl_command_advanced(
     working_dir: str = "",
     shell_type: str = "",
     timeout: int = 30
-) -> Dict[str, Any]:
+) -> AdvancedCommandResult:
     """
     高级WSL命令执行，支持更多选项
     
@@ -59,43 +129,37 @@ def execute_wsl_command_advanced(
     返回:
         命令执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
     result = wsl_tool.execute_command_advanced(
         command, distribution, user, working_dir, shell_type, timeout
     )
     
-    return {
-        "成功": result.returncode == 0,
-        "命令": command,
-        "发行版": distribution or "默认",
-        "用户": user or "默认",
-        "工作目录": working_dir or "默认",
-        "输出": result.stdout,
-        "错误": result.stderr,
-        "返回码": result.returncode
-    }
+    return AdvancedCommandResult(
+        成功=result.returncode == 0,
+        命令=command,
+        发行版=distribution or "默认",
+        用户=user or "默认",
+        工作目录=working_dir or "默认",
+        输出=result.stdout,
+        错误=result.stderr,
+        返回码=result.returncode
+    )
 
 
 @mcp.tool()
-def shutdown_wsl() -> Dict[str, Any]:
+@wsl_result()
+def shutdown_wsl() -> WSLCommandResult:
     """
     关闭所有WSL发行版和虚拟机
     
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.shutdown_wsl()
-    
-    return {
-        "成功": result.returncode == 0,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.shutdown_wsl()
 
 
 @mcp.tool()
-def terminate_wsl_distribution(distribution: str) -> Dict[str, Any]:
+@wsl_result(发行版="distribution")
+def terminate_wsl_distribution(distribution: str) -> WSLCommandResult:
     """
     终止指定的WSL发行版
     
@@ -105,19 +169,12 @@ def terminate_wsl_distribution(distribution: str) -> Dict[str, Any]:
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.terminate_distribution(distribution)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.terminate_distribution(distribution)
 
 
 @mcp.tool()
-def set_default_wsl_distribution(distribution: str) -> Dict[str, Any]:
+@wsl_result(发行版="distribution")
+def set_default_wsl_distribution(distribution: str) -> WSLCommandResult:
     """
     设置默认WSL发行版
     
@@ -127,23 +184,16 @@ def set_default_wsl_distribution(distribution: str) -> Dict[str, Any]:
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.set_default_distribution(distribution)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.set_default_distribution(distribution)
 
 
 @mcp.tool()
+@wsl_result(发行版="distribution", 文件路径="file_path", 格式="format_type")
 def export_wsl_distribution(
     distribution: str,
     file_path: str,
     format_type: str = "tar"
-) -> Dict[str, Any]:
+) -> WSLCommandResult:
     """
     导出WSL发行版到tar文件
     
@@ -155,26 +205,17 @@ def export_wsl_distribution(
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.export_distribution(distribution, file_path, format_type)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution,
-        "文件路径": file_path,
-        "格式": format_type,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.export_distribution(distribution, file_path, format_type)
 
 
 @mcp.tool()
+@wsl_result(发行版="distribution", 安装位置="install_location", 版本="version")
 def import_wsl_distribution(
     distribution: str,
     install_location: str,
     file_path: str,
     version: int = 2
-) -> Dict[str, Any]:
+) -> WSLCommandResult:
     """
     导入WSL发行版
     
@@ -187,21 +228,12 @@ def import_wsl_distribution(
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.import_distribution(distribution, install_location, file_path, version)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution,
-        "安装位置": install_location,
-        "版本": version,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.import_distribution(distribution, install_location, file_path, version)
 
 
 @mcp.tool()
-def unregister_wsl_distribution(distribution: str) -> Dict[str, Any]:
+@wsl_result(发行版="distribution")
+def unregister_wsl_distribution(distribution: str) -> WSLCommandResult:
     """
     注销并删除WSL发行版
     
@@ -211,15 +243,7 @@ def unregister_wsl_distribution(distribution: str) -> Dict[str, Any]:
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.unregister_distribution(distribution)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution,
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.unregister_distribution(distribution)
 
 
 @mcp.tool()
@@ -230,7 +254,6 @@ def get_wsl_status() -> Dict[str, Any]:
     返回:
         状态信息
     """
-    from wsl_mcp.core.wsl import wsl_tool
     result = wsl_tool.get_wsl_status()
     
     return {
@@ -248,7 +271,6 @@ def list_wsl_online_distributions() -> Dict[str, Any]:
     返回:
         可用发行版列表
     """
-    from wsl_mcp.core.wsl import wsl_tool
     distros = wsl_tool.list_online_distributions()
     
     return {
@@ -259,11 +281,12 @@ def list_wsl_online_distributions() -> Dict[str, Any]:
 
 
 @mcp.tool()
+@wsl_result(发行版="distribution")
 def install_wsl_distribution(
     distribution: str = "",
     web_download: bool = False,
     no_launch: bool = False
-) -> Dict[str, Any]:
+) -> WSLCommandResult:
     """
     安装WSL发行版
     
@@ -275,15 +298,7 @@ def install_wsl_distribution(
     返回:
         执行结果
     """
-    from wsl_mcp.core.wsl import wsl_tool
-    result = wsl_tool.install_distribution(distribution, web_download, no_launch)
-    
-    return {
-        "成功": result.returncode == 0,
-        "发行版": distribution or "默认",
-        "消息": result.stdout,
-        "错误": result.stderr
-    }
+    return wsl_tool.install_distribution(distribution, web_download, no_launch)
 
 
 @mcp.tool()
@@ -294,7 +309,6 @@ def get_wsl_version() -> Dict[str, Any]:
     返回:
         WSL版本信息
     """
-    from wsl_mcp.core.wsl import wsl_tool
     version = wsl_tool.get_wsl_version()
     
     return {
@@ -311,13 +325,12 @@ def list_wsl_distributions() -> Dict[str, Any]:
     返回:
         发行版列表
     """
-    from wsl_mcp.core.wsl import wsl_tool
     distros = wsl_tool.list_distributions()
     
     return {
         "成功": True,
         "发行版数量": len(distros),
-        "发行版列表": distros
+        "发行版列表": [distro.to_dict() for distro in distros]
     }
 
 
@@ -329,7 +342,6 @@ def get_default_distribution() -> Dict[str, Any]:
     返回:
         默认发行版信息
     """
-    from wsl_mcp.core.wsl import wsl_tool
     distro = wsl_tool.get_default_distribution()
     
     return {
@@ -349,7 +361,6 @@ def convert_windows_to_wsl_path(windows_path: str) -> Dict[str, Any]:
     返回:
         转换后的WSL路径
     """
-    from wsl_mcp.core.wsl import wsl_tool
     wsl_path = wsl_tool.convert_windows_path(windows_path)
     
     return {
@@ -370,7 +381,6 @@ def convert_wsl_to_windows_path(wsl_path: str) -> Dict[str, Any]:
     返回:
         转换后的Windows路径
     """
-    from wsl_mcp.core.wsl import wsl_tool
     windows_path = wsl_tool.convert_to_windows_path(wsl_path)
     
     return {
@@ -395,8 +405,29 @@ def read_wsl_file(
     返回:
         文件内容
     """
-    from wsl_mcp.tools.file_manager import read_file
-    return read_file(file_path, encoding)
+    return fm.read_file(file_path, encoding)
+
+
+@mcp.tool()
+def read_wsl_file_chunk(
+    file_path: str,
+    offset: int = 0,
+    size: int = 65536,
+    encoding: str = "utf-8"
+) -> Dict[str, Any]:
+    """
+    分段读取WSL中的文件内容，用返回的下一偏移继续读取后续内容
+    
+    参数:
+        file_path: WSL中的文件路径
+        offset: 起始字节偏移
+        size: 最多读取的字节数
+        encoding: 文件编码
+        
+    返回:
+        本段内容、文件大小和下一段的起始偏移
+    """
+    return fm.read_file_chunk(file_path, offset, size, encoding)
 
 
 @mcp.tool()
@@ -416,8 +447,7 @@ def write_wsl_file(
     返回:
         写入结果
     """
-    from wsl_mcp.tools.file_manager import write_file
-    return write_file(file_path, content, encoding)
+    return fm.write_file(file_path, content, encoding)
 
 
 @mcp.tool()
@@ -437,8 +467,7 @@ def append_to_wsl_file(
     返回:
         追加结果
     """
-    from wsl_mcp.tools.file_manager import append_to_file
-    return append_to_file(file_path, content, encoding)
+    return fm.append_to_file(file_path, content, encoding)
 
 
 @mcp.tool()
@@ -456,8 +485,7 @@ def create_wsl_directory(
     返回:
         创建结果
     """
-    from wsl_mcp.tools.file_manager import create_directory
-    return create_directory(dir_path, parents)
+    return fm.create_directory(dir_path, parents)
 
 
 @mcp.tool()
@@ -471,8 +499,7 @@ def list_wsl_directory(dir_path: str = "~") -> Dict[str, Any]:
     返回:
         目录内容列表
     """
-    from wsl_mcp.tools.file_manager import list_directory
-    return list_directory(dir_path)
+    return fm.list_directory(dir_path)
 
 
 @mcp.tool()
@@ -490,8 +517,7 @@ def delete_wsl_path(
     返回:
         删除结果
     """
-    from wsl_mcp.tools.file_manager import delete_file
-    return delete_file(file_path, recursive)
+    return fm.delete_file(file_path, recursive)
 
 
 @mcp.tool()
@@ -511,8 +537,7 @@ def copy_wsl_file(
     返回:
         复制结果
     """
-    from wsl_mcp.tools.file_manager import copy_file
-    return copy_file(source, destination, recursive)
+    return fm.copy_file(source, destination, recursive)
 
 
 @mcp.tool()
@@ -527,8 +552,7 @@ def move_wsl_file(source: str, destination: str) -> Dict[str, Any]:
     返回:
         移动结果
     """
-    from wsl_mcp.tools.file_manager import move_file
-    return move_file(source, destination)
+    return fm.move_file(source, destination)
 
 
 @mcp.tool()
@@ -542,8 +566,7 @@ def get_wsl_file_info(file_path: str) -> Dict[str, Any]:
     返回:
         文件信息
     """
-    from wsl_mcp.tools.file_manager import get_file_info
-    return get_file_info(file_path)
+    return fm.get_file_info(file_path)
 
 
 @mcp.tool()
@@ -557,8 +580,7 @@ def check_wsl_path_exists(file_path: str) -> Dict[str, Any]:
     返回:
         检查结果
     """
-    from wsl_mcp.tools.file_manager import file_exists
-    return file_exists(file_path)
+    return fm.file_exists(file_path)
 
 
 @mcp.tool()
@@ -572,8 +594,7 @@ def is_wsl_directory(path: str) -> Dict[str, Any]:
     返回:
         检查结果
     """
-    from wsl_mcp.tools.file_manager import is_directory
-    return is_directory(path)
+    return fm.is_directory(path)
 
 
 @mcp.tool()
@@ -587,8 +608,7 @@ def is_wsl_file(path: str) -> Dict[str, Any]:
     返回:
         检查结果
     """
-    from wsl_mcp.tools.file_manager import is_file
-    return is_file(path)
+    return fm.is_file(path)
 
 
 @mcp.tool()
@@ -599,8 +619,7 @@ def get_wsl_current_directory() -> Dict[str, Any]:
     返回:
         当前工作目录
     """
-    from wsl_mcp.tools.file_manager import get_current_directory
-    return get_current_directory()
+    return fm.get_current_directory()
 
 
 @mcp.tool()
@@ -614,8 +633,7 @@ def change_wsl_directory(dir_path: str) -> Dict[str, Any]:
     返回:
         切换结果
     """
-    from wsl_mcp.tools.file_manager import change_directory
-    return change_directory(dir_path)
+    return fm.change_directory(dir_path)
 
 
 @mcp.tool()
@@ -637,15 +655,15 @@ def read_wsl_file_lines(
     返回:
         文件内容
     """
-    from wsl_mcp.tools.file_manager import read_file_lines
-    return read_file_lines(file_path, start_line, end_line, encoding)
+    return fm.read_file_lines(file_path, start_line, end_line, encoding)
 
 
 @mcp.tool()
 def search_in_wsl_file(
     file_path: str, 
     pattern: str, 
-    use_regex: bool = False
+    use_regex: bool = False,
+    count_only: bool = False
 ) -> Dict[str, Any]:
     """
     在WSL文件中搜索内容
@@ -654,12 +672,12 @@ def search_in_wsl_file(
         file_path: WSL中的文件路径
         pattern: 搜索模式
         use_regex: 是否使用正则表达式
+        count_only: 只返回匹配行数，不返回匹配内容
         
     返回:
         搜索结果
     """
-    from wsl_mcp.tools.file_manager import search_in_file
-    return search_in_file(file_path, pattern, use_regex)
+    return fm.search_in_file(file_path, pattern, use_regex, count_only)
 
 
 @mcp.tool()
@@ -673,9 +691,60 @@ def count_wsl_file_lines(file_path: str) -> Dict[str, Any]:
     返回:
         统计结果
     """
-    from wsl_mcp.tools.file_manager import count_lines
-    return count_lines(file_path)
+    return fm.count_lines(file_path)
+
+
+@mcp.tool()
+def batch_wsl_ops(ops: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    在一次WSL调用中批量执行多个文件操作
+    
+    参数:
+        ops: 操作列表，每项形如 {"op": "read", "path": "/etc/hosts"}，
+            op 可选 read|exists|is_dir|is_file|count|info
+        
+    返回:
+        各操作的结果，顺序与ops一致
+    """
+    return fm.batch_operations(ops)
+
+
+@mcp.tool()
+async def batch_probe_wsl_paths(paths: List[str]) -> Dict[str, Any]:
+    """
+    并发检查多个WSL路径是否存在、是否为目录、是否为文件
+    
+    参数:
+        paths: WSL中的路径列表
+        
+    返回:
+        各路径的检查结果，顺序与paths一致
+    """
+    return await fm.aprobe_paths(paths)
+
+
+@mcp.tool()
+def refresh_wsl_state() -> Dict[str, Any]:
+    """
+    清空缓存的发行版列表、默认发行版和WSL版本信息并重新获取
+    
+    在WSL之外（如命令行中）安装或删除发行版后调用
+    
+    返回:
+        刷新后的发行版列表和默认发行版
+    """
+    wsl_tool.refresh()
+    distros = wsl_tool.list_distributions()
+    
+    return {
+        "成功": True,
+        "发行版数量": len(distros),
+        "发行版列表": [distro.to_dict() for distro in distros],
+        "默认发行版": wsl_tool.get_default_distribution()
+    }
 
 
 if __name__ == "__main__":
+    # 在后台预先获取发行版列表和版本信息，不阻塞服务启动
+    threading.Thread(target=wsl_tool.warm_up, daemon=True).start()
     mcp.run(transport='stdio')
@@ -3,9 +3,59 @@ WSL文件管理工具模块
 提供在WSL2环境中进行文件和目录操作的功能
 """
 
+import asyncio
+import base64
+import codecs
+import functools
+import re
+import shlex
 import subprocess
-from typing import Dict, Any, Optional
-from wsl_mcp.core.wsl import wsl_tool
+import time
+import uuid
+from typing import Dict, Any, Optional, Tuple, List
+from wsl_mcp.core.paths import shell_quote
+from wsl_mcp.core.wsl import WSLCommandResult, wsl_tool
+
+
+# read_file_chunk 每次至少读取的字节数，不小于常见编码中单个字符的最大长度
+_MAX_CHAR_BYTES = 4
+
+# 不超过该大小（字节）的写入经常驻Shell以base64传输，更大的数据改用标准输入
+_INLINE_WRITE_LIMIT = 1024 * 1024
+
+# find -printf '%y' 输出的类型字母，未列出的类型（如设备文件）归为文件
+_FIND_TYPES = {b"d": "目录", b"l": "链接"}
+
+# stat_path 结果的缓存时间片（秒），同一时间片内重复探测同一路径不再调用WSL
+_STAT_TTL = 1.0
+_STAT_CACHE_SIZE = 1024
+
+# 路径探测结果缓存，键为 (路径, 时间片)
+_stat_cache: Dict[Tuple[str, int], Tuple[bool, bool, bool]] = {}
+
+# 各类操作的默认超时（秒）：路径探测、普通读写、可能耗时较长的复制/移动/递归删除
+_PROBE_TIMEOUT = 10
+_IO_TIMEOUT = 30
+_BULK_TIMEOUT = 120
+
+# aprobe_paths 同时运行的 wsl.exe 进程数上限
+_PROBE_CONCURRENCY = 8
+
+# WSL发行版中是否安装了 ripgrep，None 表示尚未检测
+_ripgrep_available: Optional[bool] = None
+
+# get_file_info 使用的 stat 输出格式：大小、修改时间、所有者、所属组、权限、类型，以制表符分隔
+_STAT_FORMAT = "%s\\t%Y\\t%U\\t%G\\t%a\\t%F\\n"
+
+# batch_operations 支持的操作及其命令模板
+_BATCH_COMMANDS = {
+    "read": "cat {path}",
+    "exists": "[ -e {path} ]",
+    "is_dir": "[ -d {path} ]",
+    "is_file": "[ -f {path} ]",
+    "count": "wc -l < {path}",
+    "info": "stat --printf '" + _STAT_FORMAT + "' {path}",
+}
 
 
 def read_file(file_path: str, encoding: str = "utf-8") -> Dict[str, Any]:
@@ -19,30 +69,128 @@ def read_file(file_path: str, encoding: str = "utf-8") -> Dict[str, Any]:
     返回:
         文件内容
     """
-    command = f"cat '{file_path}'"
-    result = wsl_tool.execute_command(command)
+    command = f"cat {shell_quote(file_path)}"
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(command, _IO_TIMEOUT)
     
-    if result.returncode == 0:
+    if returncode == 0:
         try:
-            content = result.stdout
+            # 无法解码的字节替换为 U+FFFD，个别坏字节不影响读取整个文件
+            content = stdout.decode(encoding, errors="replace")
             return {
                 "成功": True,
                 "文件路径": file_path,
                 "内容": content,
                 "编码": encoding
             }
-        except UnicodeDecodeError:
+        except LookupError:
             return {
                 "成功": False,
                 "文件路径": file_path,
-                "错误": "文件编码无法解析，请尝试其他编码"
+                "错误": f"不支持的编码: {encoding}"
             }
     else:
         return {
             "成功": False,
             "文件路径": file_path,
-            "错误": result.stderr
+            "错误": stderr.decode("utf-8", errors="replace").strip()
+        }
+
+
+def read_file_chunk(
+    file_path: str,
+    offset: int = 0,
+    size: int = 65536,
+    encoding: str = "utf-8"
+) -> Dict[str, Any]:
+    """
+    分段读取WSL中的文件内容，适用于不宜一次读完的大文件
+    
+    参数:
+        file_path: WSL中的文件路径
+        offset: 起始字节偏移
+        size: 最多读取的字节数，小于单个字符的最大长度时按该长度读取
+        encoding: 文件编码
+        
+    返回:
+        本段内容、文件大小和下一段的起始偏移
+    """
+    if offset < 0 or size <= 0:
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": "offset 不能为负数，size 必须大于0"
+        }
+    
+    # 至少读取一个完整字符的长度，否则段尾的字符永远无法解码，下一偏移不会前进
+    size = max(size, _MAX_CHAR_BYTES)
+    
+    # 第一行输出文件大小，之后是从offset开始的至多size个字节
+    command = f"stat -c %s {shell_quote(file_path)} && tail -c +{offset + 1} {shell_quote(file_path)} | head -c {size}"
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(command, _IO_TIMEOUT)
+    
+    # 管道的返回码只反映 head，tail 读取失败时只能从stderr判断
+    if returncode != 0 or stderr:
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": stderr.decode("utf-8", errors="replace").strip()
+        }
+    
+    total, _, data = stdout.partition(b"\n")
+    try:
+        # 增量解码：段尾被截断的多字节字符留到下一段
+        decoder = codecs.getincrementaldecoder(encoding)()
+        content = decoder.decode(data, final=len(data) < size)
+        pending = len(decoder.getstate()[0])
+        file_size = int(total)
+    except (UnicodeDecodeError, LookupError, ValueError):
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": "文件编码无法解析，请尝试其他编码"
+        }
+    
+    next_offset = offset + len(data) - pending
+    if data and next_offset == offset:
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": "无法从该偏移解码出完整字符，请增大 size"
         }
+    
+    return {
+        "成功": True,
+        "文件路径": file_path,
+        "内容": content,
+        "编码": encoding,
+        "文件大小": file_size,
+        "起始偏移": offset,
+        "下一偏移": next_offset,
+        "已读完": next_offset >= file_size
+    }
+
+
+def _write_bytes(file_path: str, data: bytes, append: bool = False) -> WSLCommandResult:
+    """
+    把字节数据写入WSL文件
+    
+    较小的数据以base64编码后经常驻Shell写入，不需要启动新进程；
+    超过 _INLINE_WRITE_LIMIT 的数据通过一次性进程的标准输入写入
+    
+    参数:
+        file_path: WSL中的文件路径
+        data: 要写入的数据
+        append: 是否追加而不是覆盖
+        
+    返回:
+        命令执行结果
+    """
+    redirect = ">>" if append else ">"
+    if len(data) <= _INLINE_WRITE_LIMIT:
+        encoded = base64.b64encode(data).decode("ascii")
+        command = f"printf '%s' '{encoded}' | base64 -d {redirect} {shell_quote(file_path)}"
+        return wsl_tool.execute_command(command, _IO_TIMEOUT)
+    return wsl_tool.execute_command_stdin(f"cat {redirect} {shell_quote(file_path)}", data, _IO_TIMEOUT)
 
 
 def write_file(
@@ -61,9 +209,17 @@ def write_file(
     返回:
         写入结果
     """
-    escaped_content = content.replace("'", "'\"'\"'")
-    command = f"echo '{escaped_content}' > '{file_path}'"
-    result = wsl_tool.execute_command(command)
+    try:
+        data = content.encode(encoding)
+    except (UnicodeEncodeError, LookupError) as e:
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": f"无法使用 {encoding} 编码内容: {e}"
+        }
+    
+    result = _write_bytes(file_path, data, append=False)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
@@ -95,9 +251,17 @@ def append_to_file(
     返回:
         追加结果
     """
-    escaped_content = content.replace("'", "'\"'\"'")
-    command = f"echo '{escaped_content}' >> '{file_path}'"
-    result = wsl_tool.execute_command(command)
+    try:
+        data = content.encode(encoding)
+    except (UnicodeEncodeError, LookupError) as e:
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "错误": f"无法使用 {encoding} 编码内容: {e}"
+        }
+    
+    result = _write_bytes(file_path, data, append=True)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
@@ -128,11 +292,12 @@ def create_directory(
         创建结果
     """
     if parents:
-        command = f"mkdir -p '{dir_path}'"
+        command = f"mkdir -p {shell_quote(dir_path)}"
     else:
-        command = f"mkdir '{dir_path}'"
+        command = f"mkdir {shell_quote(dir_path)}"
     
-    result = wsl_tool.execute_command(command)
+    result = wsl_tool.execute_command(command, _IO_TIMEOUT)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
@@ -156,38 +321,45 @@ def list_directory(dir_path: str = "~") -> Dict[str, Any]:
         dir_path: WSL中的目录路径，默认为用户主目录
         
     返回:
-        目录内容列表
+        目录内容，各字段分别以列表给出，同一下标对应同一项
     """
-    command = f"ls -la '{dir_path}'"
-    result = wsl_tool.execute_command(command)
+    # 每项一条以NUL结尾的记录：类型、八进制权限、大小、修改时间、名称，名称可含任意字符；
+    # 路径末尾加 / 使符号链接指向的目录也能列出，路径不是目录时报错
+    command = f"find {shell_quote(dir_path + '/')} -maxdepth 1 -mindepth 1 -printf '%y\\t%m\\t%s\\t%T@\\t%f\\0'"
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(command, _IO_TIMEOUT)
     
-    if result.returncode == 0:
-        lines = result.stdout.strip().split('\n')
-        items = []
-        for line in lines:
-            if line:
-                parts = line.split()
-                if len(parts) >= 9:
-                    perms = parts[0]
-                    name = " ".join(parts[8:])
-                    is_dir = perms.startswith('d')
-                    items.append({
-                        "名称": name,
-                        "权限": perms,
-                        "类型": "目录" if is_dir else "文件"
-                    })
+    if returncode == 0:
+        records = [record.split(b"\t", 4) for record in stdout.split(b"\0")[:-1]]
+        records.sort(key=lambda record: record[-1])
+        
+        count = len(records)
+        names: List[Optional[str]] = [None] * count
+        modes: List[Optional[str]] = [None] * count
+        types: List[Optional[str]] = [None] * count
+        sizes: List[Optional[int]] = [None] * count
+        mtimes: List[Optional[int]] = [None] * count
+        for i, (file_type, mode, size, mtime, name) in enumerate(records):
+            names[i] = name.decode("utf-8", errors="replace")
+            modes[i] = mode.decode("ascii")
+            types[i] = _FIND_TYPES.get(file_type, "文件")
+            sizes[i] = int(size)
+            mtimes[i] = int(float(mtime))
         
         return {
             "成功": True,
             "目录路径": dir_path,
-            "项目数量": len(items),
-            "内容": items
+            "项目数量": count,
+            "名称列表": names,
+            "权限列表": modes,
+            "类型列表": types,
+            "大小列表": sizes,
+            "修改时间列表": mtimes
         }
     else:
         return {
             "成功": False,
             "目录路径": dir_path,
-            "错误": result.stderr
+            "错误": stderr.decode("utf-8", errors="replace").strip()
         }
 
 
@@ -203,11 +375,12 @@ def delete_file(file_path: str, recursive: bool = False) -> Dict[str, Any]:
         删除结果
     """
     if recursive:
-        command = f"rm -rf '{file_path}'"
+        command = f"rm -rf {shell_quote(file_path)}"
     else:
-        command = f"rm -f '{file_path}'"
+        command = f"rm -f {shell_quote(file_path)}"
     
-    result = wsl_tool.execute_command(command)
+    result = wsl_tool.execute_command(command, _BULK_TIMEOUT)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
@@ -239,18 +412,25 @@ def copy_file(
     返回:
         复制结果
     """
-    if recursive:
-        command = f"cp -r '{source}' '{destination}'"
-    else:
-        command = f"cp '{source}' '{destination}'"
+    flags = "-r " if recursive else ""
     
-    result = wsl_tool.execute_command(command)
+    # --reflink=auto 在支持写时复制的文件系统上只复制元数据，不支持时自动退回普通复制
+    method = "reflink=auto"
+    command = f"cp --reflink=auto {flags}{shell_quote(source)} {shell_quote(destination)}"
+    result = wsl_tool.execute_command(command, _BULK_TIMEOUT)
+    if result.returncode != 0 and "reflink" in result.stderr:
+        # cp 不认识该选项（如 busybox），改用普通复制
+        method = "cp"
+        command = f"cp {flags}{shell_quote(source)} {shell_quote(destination)}"
+        result = wsl_tool.execute_command(command, _BULK_TIMEOUT)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
             "成功": True,
             "源路径": source,
             "目标路径": destination,
+            "方法": method,
             "消息": "复制成功"
         }
     else:
@@ -273,8 +453,9 @@ def move_file(source: str, destination: str) -> Dict[str, Any]:
     返回:
         移动结果
     """
-    command = f"mv '{source}' '{destination}'"
-    result = wsl_tool.execute_command(command)
+    command = f"mv {shell_quote(source)} {shell_quote(destination)}"
+    result = wsl_tool.execute_command(command, _BULK_TIMEOUT)
+    _clear_stat_cache()
     
     if result.returncode == 0:
         return {
@@ -292,6 +473,33 @@ def move_file(source: str, destination: str) -> Dict[str, Any]:
         }
 
 
+def _parse_stat(output: str) -> Optional[Dict[str, Any]]:
+    """
+    解析按 _STAT_FORMAT 输出的一行 stat 结果
+    
+    参数:
+        output: stat 的输出
+        
+    返回:
+        文件信息字典，格式不符时返回None
+    """
+    fields = output.strip("\n").split("\t")
+    if len(fields) != 6:
+        return None
+    size, mtime, user, group, mode, file_type = fields
+    try:
+        return {
+            "大小": int(size),
+            "修改时间": int(mtime),
+            "所有者": user,
+            "所属组": group,
+            "权限": mode,
+            "类型": file_type
+        }
+    except ValueError:
+        return None
+
+
 def get_file_info(file_path: str) -> Dict[str, Any]:
     """
     获取WSL中文件或目录的详细信息
@@ -302,14 +510,21 @@ def get_file_info(file_path: str) -> Dict[str, Any]:
     返回:
         文件信息
     """
-    command = f"stat '{file_path}'"
-    result = wsl_tool.execute_command(command)
+    command = f"stat --printf '{_STAT_FORMAT}' {shell_quote(file_path)}"
+    result = wsl_tool.execute_command(command, _PROBE_TIMEOUT)
     
     if result.returncode == 0:
+        info = _parse_stat(result.stdout)
+        if info is None:
+            return {
+                "成功": False,
+                "路径": file_path,
+                "错误": "无法解析文件信息"
+            }
         return {
             "成功": True,
             "路径": file_path,
-            "详细信息": result.stdout
+            "详细信息": info
         }
     else:
         return {
@@ -319,6 +534,68 @@ def get_file_info(file_path: str) -> Dict[str, Any]:
         }
 
 
+def _probe_command(path: str) -> str:
+    """生成一次检查存在/目录/文件三种状态的命令"""
+    path = shell_quote(path)
+    return f"[ -e {path} ] && echo E; [ -d {path} ] && echo D; [ -f {path} ] && echo F"
+
+
+def _parse_probe(output: str) -> Tuple[bool, bool, bool]:
+    """解析 _probe_command 的输出"""
+    flags = output.split()
+    return "E" in flags, "D" in flags, "F" in flags
+
+
+def _stat_cache_key(path: str) -> Tuple[str, int]:
+    """返回路径在当前时间片内的缓存键"""
+    return path, int(time.monotonic() / _STAT_TTL)
+
+
+def _stat_cache_store(key: Tuple[str, int], result: WSLCommandResult) -> Tuple[bool, bool, bool]:
+    """
+    解析探测结果并写入缓存，探测本身失败（如超时）时不缓存
+    
+    参数:
+        key: _stat_cache_key 返回的缓存键
+        result: 探测命令的执行结果
+        
+    返回:
+        (是否存在, 是否为目录, 是否为文件)
+    """
+    flags = _parse_probe(result.stdout)
+    if result.returncode != -1:
+        if len(_stat_cache) >= _STAT_CACHE_SIZE:
+            # 只保留当前时间片的结果，其余都已过期
+            for stale in [k for k in _stat_cache if k[1] != key[1]]:
+                del _stat_cache[stale]
+        _stat_cache[key] = flags
+    return flags
+
+
+def _clear_stat_cache() -> None:
+    """文件被修改后清空路径探测缓存和行数缓存"""
+    _stat_cache.clear()
+    _count_lines_cached.cache_clear()
+
+
+def stat_path(path: str) -> Tuple[bool, bool, bool]:
+    """
+    一次WSL调用同时检查路径是否存在、是否为目录、是否为文件
+    
+    参数:
+        path: WSL中的路径
+        
+    返回:
+        (是否存在, 是否为目录, 是否为文件)
+    """
+    key = _stat_cache_key(path)
+    flags = _stat_cache.get(key)
+    if flags is None:
+        result = wsl_tool.execute_command(_probe_command(path), _PROBE_TIMEOUT)
+        flags = _stat_cache_store(key, result)
+    return flags
+
+
 def file_exists(file_path: str) -> Dict[str, Any]:
     """
     检查WSL中文件或目录是否存在
@@ -329,10 +606,7 @@ def file_exists(file_path: str) -> Dict[str, Any]:
     返回:
         检查结果
     """
-    command = f"if [ -e '{file_path}' ]; then echo 'exists'; else echo 'not_exists'; fi"
-    result = wsl_tool.execute_command(command)
-    
-    exists = result.stdout == "exists"
+    exists = stat_path(file_path)[0]
     return {
         "成功": True,
         "路径": file_path,
@@ -350,10 +624,7 @@ def is_directory(path: str) -> Dict[str, Any]:
     返回:
             检查结果
     """
-    command = f"if [ -d '{path}' ]; then echo 'dir'; else echo 'not_dir'; fi"
-    result = wsl_tool.execute_command(command)
-    
-    is_dir = result.stdout == "dir"
+    is_dir = stat_path(path)[1]
     return {
         "成功": True,
         "路径": path,
@@ -371,10 +642,79 @@ def is_file(path: str) -> Dict[str, Any]:
     返回:
         检查结果
     """
-    command = f"if [ -f '{path}' ]; then echo 'file'; else echo 'not_file'; fi"
-    result = wsl_tool.execute_command(command)
+    is_file = stat_path(path)[2]
+    return {
+        "成功": True,
+        "路径": path,
+        "是文件": is_file
+    }
+
+
+async def astat_path(path: str) -> Tuple[bool, bool, bool]:
+    """
+    stat_path 的异步版本，多个路径可通过 asyncio.gather 并发探测，与 stat_path 共用缓存
+    
+    参数:
+        path: WSL中的路径
+        
+    返回:
+        (是否存在, 是否为目录, 是否为文件)
+    """
+    key = _stat_cache_key(path)
+    flags = _stat_cache.get(key)
+    if flags is None:
+        result = await wsl_tool.aexecute_command(_probe_command(path), _PROBE_TIMEOUT)
+        flags = _stat_cache_store(key, result)
+    return flags
+
+
+async def afile_exists(file_path: str) -> Dict[str, Any]:
+    """
+    file_exists 的异步版本
+    
+    参数:
+        file_path: WSL中的文件或目录路径
+        
+    返回:
+        检查结果
+    """
+    exists = (await astat_path(file_path))[0]
+    return {
+        "成功": True,
+        "路径": file_path,
+        "存在": exists
+    }
+
+
+async def ais_directory(path: str) -> Dict[str, Any]:
+    """
+    is_directory 的异步版本
+    
+    参数:
+        path: WSL中的路径
+        
+    返回:
+        检查结果
+    """
+    is_dir = (await astat_path(path))[1]
+    return {
+        "成功": True,
+        "路径": path,
+        "是目录": is_dir
+    }
+
+
+async def ais_file(path: str) -> Dict[str, Any]:
+    """
+    is_file 的异步版本
     
-    is_file = result.stdout == "file"
+    参数:
+        path: WSL中的路径
+        
+    返回:
+        检查结果
+    """
+    is_file = (await astat_path(path))[2]
     return {
         "成功": True,
         "路径": path,
@@ -382,6 +722,40 @@ def is_file(path: str) -> Dict[str, Any]:
     }
 
 
+async def aprobe_paths(paths: List[str]) -> Dict[str, Any]:
+    """
+    并发探测多个路径的存在/目录/文件状态
+    
+    参数:
+        paths: WSL中的路径列表
+        
+    返回:
+        各路径的探测结果，顺序与paths一致
+    """
+    # 每个路径启动一个 wsl.exe，重复路径只探测一次并限制并发数
+    semaphore = asyncio.Semaphore(_PROBE_CONCURRENCY)
+    
+    async def probe(path: str) -> Tuple[bool, bool, bool]:
+        async with semaphore:
+            return await astat_path(path)
+    
+    unique_paths = list(dict.fromkeys(paths))
+    probed = dict(zip(unique_paths, await asyncio.gather(*(probe(path) for path in unique_paths))))
+    probes = [probed[path] for path in paths]
+    return {
+        "成功": True,
+        "结果": [
+            {
+                "路径": path,
+                "存在": exists,
+                "是目录": is_dir,
+                "是文件": is_file
+            }
+            for path, (exists, is_dir, is_file) in zip(paths, probes)
+        ]
+    }
+
+
 def get_current_directory() -> Dict[str, Any]:
     """
     获取WSL当前工作目录
@@ -389,7 +763,13 @@ def get_current_directory() -> Dict[str, Any]:
     返回:
         当前工作目录
     """
-    result = wsl_tool.execute_command("pwd")
+    if wsl_tool.working_directory is not None:
+        return {
+            "成功": True,
+            "当前目录": wsl_tool.working_directory
+        }
+    
+    result = wsl_tool.execute_command("pwd", _PROBE_TIMEOUT)
     
     if result.returncode == 0:
         return {
@@ -405,7 +785,7 @@ def get_current_directory() -> Dict[str, Any]:
 
 def change_directory(dir_path: str) -> Dict[str, Any]:
     """
-    切换WSL当前工作目录
+    切换WSL当前工作目录，之后的命令和相对路径都基于该目录
     
     参数:
         dir_path: 目标目录路径
@@ -413,10 +793,10 @@ def change_directory(dir_path: str) -> Dict[str, Any]:
     返回:
         切换结果
     """
-    command = f"cd '{dir_path}' && pwd"
-    result = wsl_tool.execute_command(command)
-    
+    result = wsl_tool.set_working_directory(dir_path)
     if result.returncode == 0:
+        # 缓存以调用者给出的路径为键，相对路径换了工作目录后指向不同的文件
+        _clear_stat_cache()
         return {
             "成功": True,
             "新目录": result.stdout
@@ -448,32 +828,59 @@ def read_file_lines(
         文件内容
     """
     if end_line:
-        command = f"sed -n '{start_line},{end_line}p' '{file_path}'"
+        # 读到结束行后立即退出，不再扫描文件剩余部分
+        command = f"sed -n '{start_line},{end_line}p;{end_line}q' {shell_quote(file_path)}"
     else:
-        command = f"sed -n '{start_line},$p' '{file_path}'"
+        command = f"tail -n +{start_line} {shell_quote(file_path)}"
     
-    result = wsl_tool.execute_command(command)
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(command, _IO_TIMEOUT)
     
-    if result.returncode == 0:
+    if returncode == 0:
+        try:
+            content = stdout.decode(encoding, errors="replace")
+        except LookupError:
+            return {
+                "成功": False,
+                "文件路径": file_path,
+                "错误": f"不支持的编码: {encoding}"
+            }
         return {
             "成功": True,
             "文件路径": file_path,
             "起始行": start_line,
             "结束行": end_line,
-            "内容": result.stdout
+            "内容": content
         }
     else:
         return {
             "成功": False,
             "文件路径": file_path,
-            "错误": result.stderr
+            "错误": stderr.decode("utf-8", errors="replace").strip()
         }
 
 
+def _has_ripgrep() -> bool:
+    """
+    检查WSL发行版中是否安装了 ripgrep，结果在首次检测成功后缓存
+    
+    返回:
+        是否可以使用 rg
+    """
+    global _ripgrep_available
+    if _ripgrep_available is None:
+        result = wsl_tool.execute_command("command -v rg", _PROBE_TIMEOUT)
+        if result.returncode == -1:
+            # 检测本身失败（如超时），下次再试
+            return False
+        _ripgrep_available = result.returncode == 0 and bool(result.stdout)
+    return _ripgrep_available
+
+
 def search_in_file(
     file_path: str, 
     pattern: str, 
-    use_regex: bool = False
+    use_regex: bool = False,
+    count_only: bool = False
 ) -> Dict[str, Any]:
     """
     在WSL文件中搜索内容
@@ -482,19 +889,46 @@ def search_in_file(
         file_path: WSL中的文件路径
         pattern: 搜索模式
         use_regex: 是否使用正则表达式
+        count_only: 只返回匹配行数，不返回匹配内容
         
     返回:
         搜索结果
     """
+    # 正则语法在 grep 和 rg 之间并不相同，只有固定字符串搜索才改用 rg
     if use_regex:
-        command = f"grep -n '{pattern}' '{file_path}'"
+        program = "grep"
+    elif _has_ripgrep():
+        program = "rg --no-config --no-heading -F"
     else:
-        command = f"grep -nF '{pattern}' '{file_path}'"
+        program = "grep -F"
+    
+    if count_only:
+        command = f"{program} -c -e {shlex.quote(pattern)} {shell_quote(file_path)}"
+        result = wsl_tool.execute_command(command, _IO_TIMEOUT)
+        # 没有匹配时返回1，grep 输出计数0，rg 不输出
+        if result.returncode in (0, 1) and not result.stderr and (result.stdout.isdigit() or not result.stdout):
+            return {
+                "成功": True,
+                "文件路径": file_path,
+                "搜索模式": pattern,
+                "匹配行数": int(result.stdout or 0)
+            }
+        return {
+            "成功": False,
+            "文件路径": file_path,
+            "搜索模式": pattern,
+            "错误": result.stderr
+        }
     
-    result = wsl_tool.execute_command(command)
+    command = f"{program} -n -e {shlex.quote(pattern)} {shell_quote(file_path)}"
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(command, _IO_TIMEOUT)
     
-    if result.returncode == 0:
-        lines = result.stdout.strip().split('\n') if result.stdout else []
+    # 返回码1表示没有匹配行
+    if returncode in (0, 1) and not stderr:
+        lines = [
+            line.decode("utf-8", errors="replace")
+            for line in stdout.rstrip(b"\n").split(b"\n")
+        ] if stdout else []
         return {
             "成功": True,
             "文件路径": file_path,
@@ -507,10 +941,31 @@ def search_in_file(
             "成功": False,
             "文件路径": file_path,
             "搜索模式": pattern,
-            "错误": result.stderr
+            "错误": stderr.decode("utf-8", errors="replace").strip()
         }
 
 
+@functools.lru_cache(maxsize=256)
+def _count_lines_cached(file_path: str, stamp: str) -> int:
+    """
+    统计文件行数，结果按 (路径, 文件状态) 缓存，文件未变化时不再重新统计
+    
+    参数:
+        file_path: WSL中的文件路径
+        stamp: 纳秒精度的修改时间、状态变更时间、inode和大小，只用作缓存键
+        
+    返回:
+        行数
+        
+    异常:
+        OSError: 统计失败，异常不会被缓存
+    """
+    stdout, stderr, returncode = wsl_tool.execute_command_bytes(f"wc -l < {shell_quote(file_path)}", _IO_TIMEOUT)
+    if returncode != 0:
+        raise OSError(stderr.decode("utf-8", errors="replace").strip())
+    return int(stdout)
+
+
 def count_lines(file_path: str) -> Dict[str, Any]:
     """
     统计WSL中文件的行数
@@ -521,18 +976,28 @@ def count_lines(file_path: str) -> Dict[str, Any]:
     返回:
         统计结果
     """
-    command = f"wc -l '{file_path}'"
-    result = wsl_tool.execute_command(command)
+    # 秒级时间戳分辨不出同一秒内的等长改写，带上纳秒、ctime和inode
+    command = f"stat -c '%.9Y %.9Z %i %s' {shell_quote(file_path)}"
+    result = wsl_tool.execute_command(command, _PROBE_TIMEOUT)
     
     if result.returncode == 0:
         try:
-            line_count = int(result.stdout.strip().split()[0])
+            stamp = result.stdout.strip()
+            if len(stamp.split()) != 4:
+                raise ValueError(stamp)
+            line_count = _count_lines_cached(file_path, stamp)
             return {
                 "成功": True,
                 "文件路径": file_path,
                 "行数": line_count
             }
-        except (ValueError, IndexError):
+        except OSError as e:
+            return {
+                "成功": False,
+                "文件路径": file_path,
+                "错误": str(e)
+            }
+        except ValueError:
             return {
                 "成功": False,
                 "文件路径": file_path,
@@ -544,3 +1009,96 @@ def count_lines(file_path: str) -> Dict[str, Any]:
             "文件路径": file_path,
             "错误": result.stderr
         }
+
+
+def _batch_result(op: str, path: str, stdout: bytes, stderr: bytes, returncode: int) -> Dict[str, Any]:
+    """
+    构造批量操作中单个操作的结果，格式与对应的单项函数一致
+    
+    参数:
+        op: 操作名
+        path: 操作的路径
+        stdout: 操作的标准输出
+        stderr: 操作的标准错误
+        returncode: 操作的返回码
+        
+    返回:
+        操作结果
+    """
+    if op == "exists":
+        return {"成功": True, "路径": path, "存在": returncode == 0}
+    if op == "is_dir":
+        return {"成功": True, "路径": path, "是目录": returncode == 0}
+    if op == "is_file":
+        return {"成功": True, "路径": path, "是文件": returncode == 0}
+    
+    path_key = "路径" if op == "info" else "文件路径"
+    if returncode != 0:
+        return {"成功": False, path_key: path, "错误": stderr.decode("utf-8", errors="replace").strip()}
+    if op == "read":
+        # 与 read_file 一致：内容原样返回，不去除空白
+        return {"成功": True, "文件路径": path, "内容": stdout.decode("utf-8", errors="replace"), "编码": "utf-8"}
+    output = stdout.decode("utf-8", errors="replace").strip()
+    if op == "count":
+        try:
+            return {"成功": True, "文件路径": path, "行数": int(output)}
+        except ValueError:
+            return {"成功": False, "文件路径": path, "错误": "无法解析行数"}
+    info = _parse_stat(output)
+    if info is None:
+        return {"成功": False, "路径": path, "错误": "无法解析文件信息"}
+    return {"成功": True, "路径": path, "详细信息": info}
+
+
+def batch_operations(ops: List[Dict[str, str]], timeout: int = 60) -> Dict[str, Any]:
+    """
+    在一次WSL调用中批量执行多个文件操作
+    
+    参数:
+        ops: 操作列表，每项形如 {"op": "read", "path": "/etc/hosts"}，
+            op 可选 read|exists|is_dir|is_file|count|info
+        timeout: 整批操作的超时时间（秒）
+        
+    返回:
+        各操作的结果，顺序与ops一致
+    """
+    if not ops:
+        return {"成功": True, "操作数量": 0, "结果": []}
+    
+    token = uuid.uuid4().hex
+    parts = []
+    for item in ops:
+        template = _BATCH_COMMANDS.get(item.get("op", ""))
+        if template is not None:
+            parts.append(f"{{ {template.format(path=shell_quote(item.get('path', '')))}; }}")
+        else:
+            parts.append("false")
+        # stdout 和 stderr 各自写入分隔标记，两者分别按操作切分
+        parts.append(f"printf '\\n__SEP_{token}__%d\\n' \"$?\"; printf '\\n__SEP_{token}__\\n' >&2")
+    
+    stdout, stderr, _ = wsl_tool.execute_command_bytes("; ".join(parts), timeout)
+    
+    # stdout 切分为 [输出0, 返回码0, 输出1, 返回码1, ..., 剩余输出]，stderr 切分为 [错误0, 错误1, ..., 剩余输出]
+    out_segments = re.split(f"\n__SEP_{token}__(-?\\d+)\n".encode("ascii"), stdout)
+    err_segments = stderr.split(f"\n__SEP_{token}__\n".encode("ascii"))
+    if len(out_segments) != 2 * len(ops) + 1 or len(err_segments) != len(ops) + 1:
+        return {
+            "成功": False,
+            "操作数量": len(ops),
+            "错误": stderr.decode("utf-8", errors="replace").strip() or "批量操作输出无法解析"
+        }
+    
+    results = []
+    for i, item in enumerate(ops):
+        op = item.get("op", "")
+        path = item.get("path", "")
+        if op not in _BATCH_COMMANDS:
+            results.append({"成功": False, "操作": op, "错误": f"不支持的操作: {op}"})
+            continue
+        results.append(_batch_result(op, path, out_segments[2 * i], err_segments[i], int(out_segments[2 * i + 1])))
+    
+    return {
+        "成功": True,
+        "操作数量": len(ops),
+        "结果": results
+    }